@@ -1,24 +1,59 @@
+import numpy as np
 import pandas as pd
 import streamlit as st
 import os
+import io
+import gzip
+import json
 import datetime
-import altair as alt
+import lxml.html
 
 # --- Streamlit Page Configuration ---
 # Sets up the basic configuration for the Streamlit page, including layout, title, and sidebar state.
 st.set_page_config(layout="wide", page_title="Vahan — Vehicle Registrations", initial_sidebar_state="expanded")
 
+# --- Constants ---
+# Month abbreviations in calendar order, used for month-wise columns and selections.
+MONTH_NAMES = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+# Maps user-friendly vehicle type names to their corresponding file path segments.
+VEHICLE_TYPES = {
+    "Four Wheeler": "four_wheeler",
+    "Three Wheeler": "three_wheeler",
+    "Two Wheeler": "two_wheeler"
+}
+
 # --- Function to Load HTML Tables ---
-# Caches the loaded HTML tables to improve performance.
+# Caches the loaded HTML tables to improve performance, persisting them to disk so parsed
+# tables survive app restarts. Streamlit does not support a TTL on disk-persisted caches,
+# so the file's modification time is part of the cache key instead: a re-scraped file is
+# parsed again rather than served from the old entry. Only the number of entries is bounded.
 # This function attempts to read HTML tables from a specified file path.
-@st.cache_data
-def load_tables(html_path):
+@st.cache_data(persist="disk", max_entries=32, show_spinner=False)
+def load_tables(html_path, html_mtime):
     # Checks if the HTML file exists before attempting to load it.
     if not os.path.exists(html_path):
         return []
     try:
-        # Uses pandas to read HTML tables, specifically using the 'bs4' (BeautifulSoup) parser for robustness.
-        tables = pd.read_html(html_path, header=None, flavor="bs4")
+        # Reads the scraped page, decompressing it in memory if it was saved gzip-compressed.
+        opener = gzip.open if html_path.endswith(".gz") else open
+        with opener(html_path, "rt", encoding="utf-8") as f:
+            html_text = f.read()
+
+        # Uses pandas to read HTML tables with the fast 'lxml' parser.
+        # Falls back to the slower but more lenient 'bs4' (BeautifulSoup) parser if lxml fails.
+        try:
+            # Only converts the report's data table (the scrollable body of the data table widget)
+            # instead of every table on the page, and parses the whole file only if it is missing.
+            tree = lxml.html.document_fromstring(html_text)
+            targets = tree.xpath("//div[contains(@class, 'ui-datatable-scrollable-body')]/table")
+            if targets:
+                source = io.StringIO(lxml.html.tostring(targets[0], encoding="unicode"))
+            else:
+                source = io.StringIO(html_text)
+            tables = pd.read_html(source, header=None, flavor="lxml")
+        except Exception:
+            tables = pd.read_html(io.StringIO(html_text), header=None, flavor="bs4")
         return tables
     except ValueError:
         # Displays an error if no tables are found within the HTML file.
@@ -50,13 +85,7 @@ table_type = st.sidebar.selectbox("Select Table Type", table_type_options, index
 
 # Displays vehicle type selection only if the table type is not month-wise.
 if table_type not in ["Vehicle Category Month Wise", "Manufacturer Month Wise"]:
-    # Maps user-friendly vehicle type names to their corresponding file path segments.
-    vehicle_types = {
-        "Four Wheeler": "four_wheeler",
-        "Three Wheeler": "three_wheeler",
-        "Two Wheeler": "two_wheeler"
-    }
-    vehicle_type_options = list(vehicle_types.keys())
+    vehicle_type_options = list(VEHICLE_TYPES.keys())
     # Allows the user to select a specific vehicle type.
     selected_vehicle_type = st.sidebar.selectbox("Select Vehicle Type", vehicle_type_options, index=0)
 else:
@@ -68,46 +97,69 @@ selected_year = st.sidebar.selectbox("Select Year", year_options, index=0)
 
 # Month selection, shown only for month-wise tables.
 selected_month = None
-month_names = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
 if table_type in ["Vehicle Category Month Wise", "Manufacturer Month Wise"]:
     current_year = datetime.datetime.now().year
     current_month = datetime.datetime.now().month
 
     # For the current year, only displays months up to the current month.
     if int(selected_year) == current_year:
-        available_months = ["All"] + month_names[:current_month]
+        available_months = ["All", *MONTH_NAMES[:current_month]]
         selected_month = st.sidebar.selectbox("Select Month", available_months, index=0)
     else:
         # For past years, displays all months.
-        selected_month = st.sidebar.selectbox("Select Month", ["All"] + month_names, index=0)
+        selected_month = st.sidebar.selectbox("Select Month", ["All", *MONTH_NAMES], index=0)
 
 # --- Data Loading Function ---
-# Caches the data loading process for efficiency.
+# Caches the data loading process for efficiency, bounded in age and size to limit memory use.
 # Constructs the file path and loads the appropriate DataFrame based on user selections.
-@st.cache_data
+@st.cache_data(ttl="24h", max_entries=32, show_spinner=False)
 def get_data(year, table_type, selected_vehicle_type):
-    # Defines mapping for vehicle types to file naming conventions.
-    vehicle_types = {
-        "Four Wheeler": "four_wheeler",
-        "Three Wheeler": "three_wheeler",
-        "Two Wheeler": "two_wheeler"
-    }
-
-    # Constructs the HTML file path based on selected filters.
+    # Constructs the scraped data and Parquet file paths based on selected filters.
     if selected_vehicle_type:
-        html_path = f"src/{vehicle_types[selected_vehicle_type]}_{table_type.replace(' ', '_').lower()}_{year}.html"
+        base_path = f"src/{VEHICLE_TYPES[selected_vehicle_type]}_{table_type.replace(' ', '_').lower()}_{year}"
     else:
-        html_path = f"src/{table_type.replace(' ', '_').lower()}_{year}.html"
-        
-    # Loads tables from the constructed HTML path.
-    tables = load_tables(html_path)
-    if not tables:
-        return pd.DataFrame()
+        base_path = f"src/{table_type.replace(' ', '_').lower()}_{year}"
+    # Prefers the table rows saved as JSON by the scrapers, then the gzip-compressed page, then plain HTML.
+    source_path = next(
+        (path for path in (f"{base_path}.json", f"{base_path}.html.gz") if os.path.exists(path)),
+        f"{base_path}.html",
+    )
+    parquet_path = f"{base_path}.parquet"
+
+    # Reads the already cleaned table from Parquet when it is at least as new as the scraped data,
+    # which skips parsing entirely on cold starts.
+    if os.path.exists(parquet_path) and (
+        not os.path.exists(source_path) or os.path.getmtime(parquet_path) >= os.path.getmtime(source_path)
+    ):
+        try:
+            return pd.read_parquet(parquet_path)
+        except Exception:
+            # Falls back to the scraped data if the Parquet file is unreadable.
+            pass
         
-    # Selects the appropriate table (typically the last or second to last one) and cleans it.
-    idx = 5 if len(tables) > 5 else len(tables) - 1
-    df = tables[idx].copy()
-    df = df.reset_index(drop=True).iloc[:, 1:]
+    if source_path.endswith(".json"):
+        # Builds the table straight from the scraped rows, without parsing any HTML.
+        try:
+            with open(source_path, encoding="utf-8") as f:
+                rows = json.load(f)
+        except Exception as e:
+            st.error(f"An error occurred while loading the scraped rows: {e}")
+            return pd.DataFrame()
+        if not rows:
+            # Displays an error if the scraped file holds no rows.
+            st.error("No table rows found in the scraped data file.")
+            return pd.DataFrame()
+        df = pd.DataFrame(rows).iloc[:, 1:]
+    else:
+        # Loads tables from the constructed HTML path.
+        html_mtime = os.path.getmtime(source_path) if os.path.exists(source_path) else None
+        tables = load_tables(source_path, html_mtime)
+        if not tables:
+            return pd.DataFrame()
+            
+        # Selects the appropriate table (typically the last or second to last one) and cleans it.
+        idx = 5 if len(tables) > 5 else len(tables) - 1
+        df = tables[idx].reset_index(drop=True).iloc[:, 1:]
     
     # Assigns appropriate column names based on the selected table type and vehicle type.
     if table_type == "Manufacturer":
@@ -125,22 +177,104 @@ def get_data(year, table_type, selected_vehicle_type):
         elif selected_vehicle_type == "Four Wheeler":
             df.columns = ["Class", "4WIC", "LMV", "MMV", "HMV", "TOTAL"]
     elif table_type in ["Vehicle Category Month Wise", "Manufacturer Month Wise"]:
-        month_names = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
         key_column_name = "Category" if table_type == "Vehicle Category Month Wise" else "Manufacturer"
         num_months = len(df.columns) - 2
         if num_months > 0:
-            month_cols = month_names[:num_months]
+            month_cols = list(MONTH_NAMES[:num_months])
             df.columns = [key_column_name] + month_cols + ["TOTAL"]
         else:
             return pd.DataFrame()
     
-    # Converts relevant columns to numeric types, handling missing values.
+    # Stores the low-cardinality key column as a category, which saves memory and speeds up
+    # the merges and melts used by the comparison sections.
+    df[df.columns[0]] = df[df.columns[0]].astype("category")
+
+    # Converts relevant columns to numeric types in a single pass, handling missing values.
+    # Registration counts fit comfortably in int32, which halves memory over the default int64.
+    # Thousands separators are stripped from every numeric cell at once with numpy's string routines.
     num_cols = [col for col in df.columns if col not in [df.columns[0]]]
-    for col in num_cols:
-        df[col] = pd.to_numeric(df[col].astype(str).str.replace(",", ""), errors='coerce').fillna(0).astype(int)
+    num_values = np.char.replace(df[num_cols].to_numpy(dtype=str), ",", "")
+    df[num_cols] = (
+        pd.DataFrame(num_values, columns=num_cols, index=df.index)
+        .apply(pd.to_numeric, errors='coerce')
+        .fillna(0)
+        .astype("int32")
+    )
+
+    # Saves the cleaned table as Parquet so later cold starts can skip parsing the scraped data.
+    try:
+        df.to_parquet(parquet_path, compression="zstd", index=False)
+    except Exception:
+        # The Parquet file is only a cache, so the data is still returned if it cannot be written.
+        pass
         
     return df
 
+# --- Display Table Function ---
+# Caches the month-filtered view of the data, keyed on the same selections as get_data,
+# so that the slice is not rebuilt on every unrelated widget interaction.
+@st.cache_data(ttl="1h", max_entries=64)
+def build_display_df(year, table_type, selected_vehicle_type, selected_month):
+    df = get_data(year, table_type, selected_vehicle_type)
+
+    # Filters the DataFrame if a specific month is selected for month-wise tables.
+    if selected_month and selected_month != "All" and selected_month in df.columns:
+        display_df = df[[df.columns[0], selected_month, "TOTAL"]]
+        display_df.columns = [df.columns[0], f"{selected_month} Registrations", "TOTAL"]
+        return display_df
+
+    return df
+
+# --- CSV Export Function ---
+# Caches the CSV bytes of the displayed table so the export is only produced once per selection,
+# writing it in chunks straight into a byte buffer instead of building an intermediate string.
+@st.cache_data(ttl="1h", max_entries=64)
+def build_csv(year, table_type, selected_vehicle_type, selected_month):
+    display_df = build_display_df(year, table_type, selected_vehicle_type, selected_month)
+    buf = io.BytesIO()
+    display_df.to_csv(buf, index=False, chunksize=1000, encoding="utf-8")
+    return buf.getvalue()
+
+# --- Percentage Change Function ---
+# Computes formatted percentage changes between two columns in one vectorized pass,
+# returning "—" wherever the previous value is zero.
+def format_pct_change(current, previous):
+    current = np.asarray(current, dtype=np.float64)
+    previous = np.asarray(previous, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct = (current - previous) / previous * 100
+    return np.where(previous != 0, np.char.mod("%.2f%%", pct), "—")
+
+# --- Comparison Chart Function ---
+# Caches the melted data and the Vega-Lite spec of the Altair bar chart for a comparison,
+# so the chart is only rebuilt and encoded when its data or labels change rather than on
+# every unrelated widget interaction. The returned spec is rendered with st.vega_lite_chart.
+@st.cache_data(ttl="1h", max_entries=64)
+def build_comparison_chart(chart_df, key_col, value_vars, var_name, title):
+    # Imports Altair only when a chart is first built, keeping it off the initial page load.
+    import altair as alt
+
+    chart_df_melted = chart_df.melt(
+        id_vars=[key_col],
+        value_vars=value_vars,
+        var_name=var_name,
+        value_name="Registrations"
+    )
+
+    chart = alt.Chart(chart_df_melted).mark_bar().encode(
+        x=alt.X(f'{key_col}:N', title=key_col),
+        y=alt.Y('Registrations:Q'),
+        color=alt.Color(f'{var_name}:N', scale=alt.Scale(range=['#36A2EB', '#FF6384'])),
+        tooltip=[key_col, var_name, 'Registrations']
+    ).properties(
+        title=title
+    )
+
+    # Embeds the data in the spec without Altair's default row limit, and skips the default
+    # theme's fixed chart size the same way st.altair_chart does.
+    with alt.theme.enable("none"), alt.data_transformers.disable_max_rows():
+        return chart.to_dict()
+
 # --- Load and Display Data ---
 # Displays a spinner while data is being loaded.
 with st.spinner(f"Loading data for {table_type} in {selected_year}..."):
@@ -150,12 +284,9 @@ with st.spinner(f"Loading data for {table_type} in {selected_year}..."):
 if df.empty:
     st.error(f"No data found for the selected options.")
 else:
-    display_df = df.copy()
+    display_df = build_display_df(selected_year, table_type, selected_vehicle_type, selected_month)
     
-    # Filters the displayed DataFrame if a specific month is selected for month-wise tables.
     if selected_month and selected_month != "All" and selected_month in df.columns:
-        display_df = df[[df.columns[0], selected_month, "TOTAL"]]
-        display_df.columns = [df.columns[0], f"{selected_month} Registrations", "TOTAL"]
         st.header(f"{table_type} Data — {selected_month} {selected_year}")
     else:
         st.header(f"{table_type} Data — {selected_year}")
@@ -165,7 +296,7 @@ else:
 
     # --- Download Button ---
     # Provides a button to download the displayed data as a CSV file.
-    csv = display_df.to_csv(index=False).encode("utf-8")
+    csv = build_csv(selected_year, table_type, selected_vehicle_type, selected_month)
     st.download_button(
         label="Download table as CSV",
         data=csv,
@@ -179,30 +310,28 @@ else:
         with st.expander("📈 Monthly Comparisons"):
             st.write("This section provides a detailed analysis of month-over-month (MoM) and year-over-month (YoM) growth.")
             try:
-                current_month_index = month_names.index(selected_month)
+                current_month_index = MONTH_NAMES.index(selected_month)
                 key_col = df.columns[0]
 
                 if current_month_index > 0:
                     # Performs Month-over-Month (MoM) comparison for months other than January.
                     st.subheader("Month-over-Month (MoM) Comparison")
-                    prev_month = month_names[current_month_index - 1]
+                    prev_month = MONTH_NAMES[current_month_index - 1]
                     
                     if prev_month in df.columns and selected_month in df.columns:
                         comparison_df = df[[key_col, prev_month, selected_month]].copy()
-                        comparison_df.columns = [key_col, prev_month, selected_month]
                         
                         # Calculates the percentage change MoM.
-                        comparison_df["Change %"] = comparison_df.apply(
-                            lambda row: f"{((row[selected_month] - row[prev_month]) / row[prev_month] * 100):.2f}%"
-                            if row[prev_month] != 0 else "—",
-                            axis=1
+                        comparison_df["Change %"] = format_pct_change(
+                            comparison_df[selected_month], comparison_df[prev_month]
                         )
                         
                         st.dataframe(comparison_df, use_container_width=True)
 
                         # Calculates and displays the overall MoM growth using a Streamlit metric.
-                        current_total = comparison_df[selected_month].sum()
-                        previous_total = comparison_df[prev_month].sum()
+                        totals = comparison_df[[selected_month, prev_month]].sum()
+                        current_total = totals[selected_month]
+                        previous_total = totals[prev_month]
                         overall_change = (current_total - previous_total) / previous_total * 100 if previous_total != 0 else 0
                         
                         st.metric(
@@ -212,24 +341,15 @@ else:
                         )
                         
                         # Generates and displays an Altair bar chart for MoM comparison.
-                        chart_df_melted = pd.melt(
-                            comparison_df,
-                            id_vars=[key_col],
-                            value_vars=[selected_month, prev_month],
-                            var_name="Month",
-                            value_name="Registrations"
+                        chart = build_comparison_chart(
+                            comparison_df[[key_col, selected_month, prev_month]],
+                            key_col,
+                            [selected_month, prev_month],
+                            "Month",
+                            f"MoM Registrations: {selected_month} vs {prev_month}"
                         )
                         
-                        chart = alt.Chart(chart_df_melted).mark_bar().encode(
-                            x=alt.X(f'{key_col}:N', title=key_col),
-                            y=alt.Y('Registrations:Q'),
-                            color=alt.Color('Month:N', scale=alt.Scale(range=['#36A2EB', '#FF6384'])),
-                            tooltip=[key_col, 'Month', 'Registrations']
-                        ).properties(
-                            title=f"MoM Registrations: {selected_month} vs {prev_month}"
-                        )
-                        
-                        st.altair_chart(chart, use_container_width=True)
+                        st.vega_lite_chart(chart, use_container_width=True)
 
                     else:
                         st.info(f"Data for either {prev_month} or {selected_month} is not available for MoM calculation.")
@@ -240,26 +360,25 @@ else:
                     prev_df = get_data(prev_year, table_type, selected_vehicle_type) # Loads data for the previous year.
 
                     if "Jan" in df.columns and "Dec" in prev_df.columns:
-                        current_jan_df = df[[key_col, "Jan"]].rename(columns={"Jan": f"Jan_{selected_year}"})
-                        prev_dec_df = prev_df[[key_col, "Dec"]].rename(columns={"Dec": f"Dec_{prev_year}"})
+                        dec_prev_year_col = f"Dec_{prev_year}"
+                        jan_curr_year_col = f"Jan_{selected_year}"
+
+                        current_jan_df = df[[key_col, "Jan"]].rename(columns={"Jan": jan_curr_year_col})
+                        prev_dec_df = prev_df[[key_col, "Dec"]].rename(columns={"Dec": dec_prev_year_col})
 
                         # Merges current January data with previous December data.
+                        # Only the registration columns are filled, as the key column may be categorical.
                         comparison_df = pd.merge(
                             current_jan_df,
                             prev_dec_df,
                             on=key_col,
                             how="outer"
                         )
-                        comparison_df.fillna(0, inplace=True)
-                        
-                        dec_prev_year_col = f"Dec_{prev_year}"
-                        jan_curr_year_col = f"Jan_{selected_year}"
+                        comparison_df.fillna({jan_curr_year_col: 0, dec_prev_year_col: 0}, inplace=True)
                         
                         # Calculates the percentage change YoM.
-                        comparison_df["Change %"] = comparison_df.apply(
-                            lambda row: f"{((row[jan_curr_year_col] - row[dec_prev_year_col]) / row[dec_prev_year_col] * 100):.2f}%"
-                            if row[dec_prev_year_col] != 0 else "—",
-                            axis=1
+                        comparison_df["Change %"] = format_pct_change(
+                            comparison_df[jan_curr_year_col], comparison_df[dec_prev_year_col]
                         )
                         
                         st.dataframe(comparison_df, use_container_width=True)
@@ -276,24 +395,15 @@ else:
                         )
 
                         # Generates and displays an Altair bar chart for YoM comparison.
-                        chart_df_melted = pd.melt(
-                            comparison_df,
-                            id_vars=[key_col],
-                            value_vars=[jan_curr_year_col, dec_prev_year_col],
-                            var_name="Period",
-                            value_name="Registrations"
-                        )
-                        
-                        chart = alt.Chart(chart_df_melted).mark_bar().encode(
-                            x=alt.X(f'{key_col}:N', title=key_col),
-                            y=alt.Y('Registrations:Q'),
-                            color=alt.Color('Period:N', scale=alt.Scale(range=['#36A2EB', '#FF6384'])),
-                            tooltip=[key_col, 'Period', 'Registrations']
-                        ).properties(
-                            title=f"YoM Registrations: Jan {selected_year} vs Dec {prev_year}"
+                        chart = build_comparison_chart(
+                            comparison_df[[key_col, jan_curr_year_col, dec_prev_year_col]],
+                            key_col,
+                            [jan_curr_year_col, dec_prev_year_col],
+                            "Period",
+                            f"YoM Registrations: Jan {selected_year} vs Dec {prev_year}"
                         )
                         
-                        st.altair_chart(chart, use_container_width=True)
+                        st.vega_lite_chart(chart, use_container_width=True)
                     
                     else:
                         st.info(f"Previous year's December data ({prev_year}) or current year's January data not available for Year-over-Month calculation.")
@@ -307,7 +417,7 @@ else:
         with st.expander("🔄 Quarter-over-Quarter (QoQ) Growth"):
             try:
                 # Checks if monthly columns are available for QoQ calculation.
-                if any(m in df.columns for m in month_names):
+                if any(m in df.columns for m in MONTH_NAMES):
                     st.write("View the registration trends and percentage change between quarters.")
                     
                     # Defines the months included in each quarter.
@@ -318,34 +428,35 @@ else:
                         "Q4 (Oct-Dec)": ["Oct", "Nov", "Dec"]
                     }
                     
-                    qoq_df = df[[df.columns[0]]].copy()
-                    calculated_quarters = []
                     # Calculates total registrations for each quarter.
+                    quarter_sums = {}
                     for quarter_name, months in quarter_months.items():
                         existing_months = [m for m in months if m in df.columns]
                         if existing_months:
-                            qoq_df[quarter_name] = df[existing_months].sum(axis=1)
-                            calculated_quarters.append(quarter_name)
+                            quarter_sums[quarter_name] = df[existing_months].sum(axis=1)
+                    calculated_quarters = list(quarter_sums)
+
+                    # Joins all quarter columns to the key column in a single concat.
+                    qoq_df = pd.concat([df[[df.columns[0]]], pd.DataFrame(quarter_sums, index=df.index)], axis=1)
                     
                     if len(calculated_quarters) > 1:
-                        # Calculates Quarter-over-Quarter percentage change.
-                        for i in range(1, len(calculated_quarters)):
-                            curr_quarter = calculated_quarters[i]
-                            prev_quarter = calculated_quarters[i-1]
-                            
-                            qoq_df[f"{curr_quarter} vs {prev_quarter} QoQ%"] = qoq_df.apply(
-                                lambda row: f"{((row[curr_quarter] - row[prev_quarter]) / row[prev_quarter] * 100):.2f}%"
-                                if row[prev_quarter] != 0 else "—",
-                                axis=1
-                            )
+                        # Calculates Quarter-over-Quarter percentage change for all consecutive quarter pairs at once.
+                        quarter_values = qoq_df[calculated_quarters].to_numpy(dtype=np.float64)
+                        qoq_cols = [
+                            f"{curr_quarter} vs {prev_quarter} QoQ%"
+                            for prev_quarter, curr_quarter in zip(calculated_quarters[:-1], calculated_quarters[1:])
+                        ]
+                        qoq_df[qoq_cols] = format_pct_change(quarter_values[:, 1:], quarter_values[:, :-1])
                         
                         st.dataframe(qoq_df, use_container_width=True)
 
                         if len(calculated_quarters) > 0:
-                            chart_data = qoq_df[calculated_quarters].sum().reset_index()
+                            quarter_totals = qoq_df[calculated_quarters].sum()
+                            chart_data = quarter_totals.reset_index()
                             chart_data.columns = ["Quarter", "Total_Registrations"]
                             
                             # Generates and displays an Altair line chart for quarterly trends.
+                            import altair as alt
                             line_chart = alt.Chart(chart_data).mark_line(point=True, strokeWidth=3).encode(
                                 x=alt.X('Quarter:N', sort=calculated_quarters, axis=alt.Axis(labelAngle=-45)),
                                 y=alt.Y('Total_Registrations:Q', title="Total Registrations"),
@@ -362,7 +473,7 @@ else:
                                 last_qoq_change = qoq_df[last_qoq_col].iloc[0] if not qoq_df.empty and last_qoq_col in qoq_df.columns else "—"
                                 st.metric(
                                     label=f"Latest QoQ Growth ({calculated_quarters[-1]} vs {calculated_quarters[-2]})",
-                                    value=f"{qoq_df[calculated_quarters[-1]].sum():,}",
+                                    value=f"{quarter_totals[calculated_quarters[-1]]:,}",
                                     delta=last_qoq_change
                                 )
                     else:
@@ -385,13 +496,13 @@ else:
                 
                 # Determines whether to compare specific months or total annual data.
                 if selected_month and selected_month != "All" and selected_month in df.columns and selected_month in prev_df.columns:
-                    current_data = df[[key_col, selected_month]].copy()
-                    prev_data = prev_df[[key_col, selected_month]].copy()
+                    current_data = df[[key_col, selected_month]]
+                    prev_data = prev_df[[key_col, selected_month]]
                     data_col = selected_month
                     period_label = f" for {selected_month}"
                 else:
-                    current_data = df[[key_col, "TOTAL"]].copy()
-                    prev_data = prev_df[[key_col, "TOTAL"]].copy()
+                    current_data = df[[key_col, "TOTAL"]]
+                    prev_data = prev_df[[key_col, "TOTAL"]]
                     data_col = "TOTAL"
                     period_label = ""
                     
@@ -403,13 +514,12 @@ else:
                     how="outer",
                     suffixes=(f"_{selected_year}", f"_{prev_year}")
                 )
-                merged_df.fillna(0, inplace=True)
+                # Only the registration columns are filled, as the key column may be categorical.
+                merged_df.fillna({f'{data_col}_{selected_year}': 0, f'{data_col}_{prev_year}': 0}, inplace=True)
                 
                 # Calculates the Year-over-Year percentage change.
-                merged_df["YoY %"] = merged_df.apply(
-                    lambda row: f"{((row[f'{data_col}_{selected_year}'] - row[f'{data_col}_{prev_year}']) / row[f'{data_col}_{prev_year}'] * 100):.2f}%"
-                    if row[f'{data_col}_{prev_year}'] != 0 else "—",
-                    axis=1
+                merged_df["YoY %"] = format_pct_change(
+                    merged_df[f'{data_col}_{selected_year}'], merged_df[f'{data_col}_{prev_year}']
                 )
                 
                 st.dataframe(merged_df, use_container_width=True)
@@ -426,24 +536,16 @@ else:
                 )
                 
                 # Generates and displays an Altair bar chart for YoY comparison.
-                chart_df_melted = pd.melt(
-                    merged_df,
-                    id_vars=[key_col],
-                    value_vars=[f'{data_col}_{selected_year}', f'{data_col}_{prev_year}'],
-                    var_name="Year",
-                    value_name="Registrations"
-                )
-
-                yoy_chart = alt.Chart(chart_df_melted).mark_bar().encode(
-                    x=alt.X(f'{key_col}:N', title=key_col),
-                    y=alt.Y('Registrations:Q'),
-                    color=alt.Color('Year:N', scale=alt.Scale(range=['#36A2EB', '#FF6384'])),
-                    tooltip=[key_col, 'Year', 'Registrations']
-                ).properties(
-                    title=f"YoY Registrations: {selected_year} vs {prev_year}{period_label}"
+                yoy_value_vars = [f'{data_col}_{selected_year}', f'{data_col}_{prev_year}']
+                yoy_chart = build_comparison_chart(
+                    merged_df[[key_col] + yoy_value_vars],
+                    key_col,
+                    yoy_value_vars,
+                    "Year",
+                    f"YoY Registrations: {selected_year} vs {prev_year}{period_label}"
                 )
                 
-                st.altair_chart(yoy_chart, use_container_width=True)
+                st.vega_lite_chart(yoy_chart, use_container_width=True)
                 
             else:
                 st.warning(f"No previous year ({prev_year}) data available for YoY calculation.")
@@ -1,77 +1,87 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup
-import time
-import os
+from vahan_browser import open_vahan, load_dashboard
+from vahan_output import SAVE_HTML, save_table
 
-def fetch_manufacturer_table(vehicle_type, year, filename):
+def fetch_manufacturer_table(driver, vehicle_type, year, filename):
     """
-    Scrapes manufacturer registration data for a specific vehicle type and year.
+    Scrapes manufacturer registration data for a specific vehicle type and year using an open driver.
     """
-    chrome_options = Options()
-    # Use headless mode to run without a visible browser window.
-    # chrome_options.add_argument("--headless")
-    
-    # Path to your chromedriver executable.
-    service = Service("C://Users//jaswa//Downloads//chromedriver-win64//chromedriver-win64//chromedriver.exe")
-
-    driver = webdriver.Chrome(service=service, options=chrome_options)
-    
-    driver.get("https://vahan.parivahan.gov.in/vahan4dashboard/vahan/view/reportview.xhtml")
-    
-    driver.maximize_window()
-    
     wait = WebDriverWait(driver, 20)
     
-    # Wait for initial page content to load.
-    time.sleep(5)
-    
-    try:
-        # Select the desired Year from the dropdown menu.
-        wait.until(EC.element_to_be_clickable((By.XPATH, "//label[@id='selectedYear_label']"))).click()
-        wait.until(EC.element_to_be_clickable((By.XPATH, f"//li[@data-label='{year}']"))).click()
-        time.sleep(2)
+    # Select the desired Year from the dropdown menu.
+    wait.until(EC.element_to_be_clickable((By.ID, "selectedYear_label"))).click()
+    wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, f"#selectedYear_items li[data-label='{year}']"))).click()
+    wait.until(EC.text_to_be_present_in_element((By.ID, "selectedYear_label"), year))
 
-        # Select "Maker" for the Y-Axis.
-        wait.until(EC.element_to_be_clickable((By.XPATH, "//label[@id='yaxisVar_label']"))).click()
-        wait.until(EC.element_to_be_clickable((By.XPATH, "//li[@data-label='Maker']"))).click()
-        time.sleep(2)
+    # Select "Maker" for the Y-Axis.
+    wait.until(EC.element_to_be_clickable((By.ID, "yaxisVar_label"))).click()
+    wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "#yaxisVar_items li[data-label='Maker']"))).click()
+    wait.until(EC.text_to_be_present_in_element((By.ID, "yaxisVar_label"), "Maker"))
 
-        # Select the vehicle type in the Vehicle Category Group.
-        wait.until(EC.element_to_be_clickable((By.ID, "vchgroupTable:selectCatgGrp_label"))).click()
-        wait.until(EC.element_to_be_clickable((By.XPATH, f"//li[@data-label='{vehicle_type}']"))).click()
-        time.sleep(2)
+    # Select "Vehicle Category Group" for the X-Axis explicitly, so a driver left on another
+    # layout (e.g. "Month Wise" by a month-wise scraper) still yields the manufacturer table.
+    wait.until(EC.element_to_be_clickable((By.ID, "xaxisVar_label"))).click()
+    wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "#xaxisVar_items li[data-label='Vehicle Category Group']"))).click()
+    wait.until(EC.text_to_be_present_in_element((By.ID, "xaxisVar_label"), "Vehicle Category Group"))
 
-        # Click the Refresh button.
-        if vehicle_type == "FOUR WHEELER":
-            wait.until(EC.element_to_be_clickable((By.XPATH, "//span[text()='Refresh']"))).click()
-            time.sleep(5)
-        
-        # Scrape the page content.
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
-    
-    finally:
-        driver.quit()
-    
-    # Create the 'src' directory if it does not exist.
-    os.makedirs("src", exist_ok=True)
-    
-    file_path = os.path.join("src", filename)
+    # Select the vehicle type in the Vehicle Category Group, which re-renders the report table.
+    # The table is only re-rendered if the selection actually changes.
+    previous_table = driver.find_element(By.ID, "vchgroupTable_data")
+    group_label = wait.until(EC.element_to_be_clickable((By.ID, "vchgroupTable:selectCatgGrp_label")))
+    group_changed = group_label.text.strip() != vehicle_type
+    group_label.click()
+    wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, f"[id='vchgroupTable:selectCatgGrp_items'] li[data-label='{vehicle_type}']"))).click()
+    if group_changed:
+        wait.until(EC.staleness_of(previous_table))
+    wait.until(EC.presence_of_element_located((By.ID, "vchgroupTable_data")))
+
+    # Click the Refresh button.
+    if vehicle_type == "FOUR WHEELER":
+        previous_table = driver.find_element(By.ID, "vchgroupTable_data")
+        wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "div.button-section button"))).click()
+        wait.until(EC.staleness_of(previous_table))
+        wait.until(EC.presence_of_element_located((By.ID, "vchgroupTable_data")))
     
-    with open(file_path, "w", encoding="utf-8") as f:
-        f.write(soup.prettify())
-        
-    print(f"Saved HTML for {vehicle_type} {year} to {file_path}")
-        
-if __name__ == "__main__":
+    # Pull the report's body rows as cell texts straight from the browser.
+    rows = driver.execute_script(
+        "return Array.from(document.querySelectorAll('#vchgroupTable_data > tr'), function (row) {"
+        "  return Array.from(row.cells, function (cell) { return cell.textContent.trim(); });"
+        "});"
+    )
+
+    # The table's markup is only serialized when the HTML archive is enabled.
+    html_text = None
+    if SAVE_HTML:
+        html_text = driver.execute_script(
+            "var table = document.getElementById('vchgroupTable');"
+            "return (table || document.documentElement).outerHTML;"
+        )
+
+    json_path = save_table(rows, html_text, filename)
+
+    print(f"Saved rows for {vehicle_type} {year} to {json_path}")
+
+def run(driver):
+    """
+    Scrapes the manufacturer tables for every year and vehicle type using an open driver.
+    """
     years = ["2025", "2024", "2023"]
     vehicle_types = ["TWO WHEELER", "THREE WHEELER", "FOUR WHEELER"]
     
+    # Start from the default filters, since the driver may have been used by another scraper.
+    load_dashboard(driver)
+    
+    # A single browser session is reused for every fetch; only the filters change between them.
     for year in years:
         for vt in vehicle_types:
             fname = f"{vt.lower().replace(' ', '_')}_manufacturer_{year}.html"
-            fetch_manufacturer_table(vt, year, fname)
+            fetch_manufacturer_table(driver, vt, year, fname)
+
+if __name__ == "__main__":
+    driver = open_vahan("manufacturer")
+    try:
+        run(driver)
+    finally:
+        driver.quit()
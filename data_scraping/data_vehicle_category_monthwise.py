@@ -1,73 +1,75 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup
-import time
-import os
+from vahan_browser import open_vahan, load_dashboard
+from vahan_output import SAVE_HTML, save_table
 
-def fetch_vehicle_categoty_monthwise_data(year, filename):
+def fetch_vehicle_categoty_monthwise_data(driver, year, filename):
     """
-    Scrapes vehicle registration data month-wise by vehicle category.
+    Scrapes vehicle registration data month-wise by vehicle category using an open driver.
     """
-    chrome_options = Options()
-    # Use headless mode to run without a visible browser window.
-    # chrome_options.add_argument("--headless")
-    
-    # Path to your chromedriver executable.
-    service = Service("C://Users//jaswa//Downloads//chromedriver-win64//chromedriver-win64//chromedriver.exe")
-
-    driver = webdriver.Chrome(service=service, options=chrome_options)
-    
-    driver.get("https://vahan.parivahan.gov.in/vahan4dashboard/vahan/view/reportview.xhtml")
-    
-    driver.maximize_window()
-    
     wait = WebDriverWait(driver, 20)
     
-    # Wait for initial page content to load.
-    time.sleep(5)
+    # Select the desired Year from the dropdown menu.
+    wait.until(EC.element_to_be_clickable((By.ID, "selectedYear_label"))).click()
+    wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, f"#selectedYear_items li[data-label='{year}']"))).click()
+    wait.until(EC.text_to_be_present_in_element((By.ID, "selectedYear_label"), year))
+
+    # Select "Vehicle Category" in Y-Axis.
+    wait.until(EC.element_to_be_clickable((By.ID, "yaxisVar_label"))).click()
+    wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "#yaxisVar_items li[data-label='Vehicle Category']"))).click()
+    wait.until(EC.text_to_be_present_in_element((By.ID, "yaxisVar_label"), "Vehicle Category"))
+
+    # Select "Month Wise" for the X-Axis.
+    wait.until(EC.element_to_be_clickable((By.ID, "xaxisVar_label"))).click()
+    wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "#xaxisVar_items li[data-label='Month Wise']"))).click()
+    wait.until(EC.text_to_be_present_in_element((By.ID, "xaxisVar_label"), "Month Wise"))
     
-    try:
-        # Select the desired Year from the dropdown menu.
-        wait.until(EC.element_to_be_clickable((By.XPATH, "//label[@id='selectedYear_label']"))).click()
-        wait.until(EC.element_to_be_clickable((By.XPATH, f"//li[@data-label='{year}']"))).click()
-        time.sleep(2)
+    # Click the Refresh button.
+    previous_table = driver.find_elements(By.ID, "groupingTable")
+    wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "div.button-section button"))).click()
 
-        # Select "Vehicle Category" in Y-Axis.
-        wait.until(EC.element_to_be_clickable((By.XPATH, "//label[@id='yaxisVar_label']"))).click()
-        wait.until(EC.element_to_be_clickable((By.XPATH, "//li[@data-label='Vehicle Category']"))).click()
-        time.sleep(2)
+    # Wait for the refreshed report table to replace the previous one and contain rows.
+    if previous_table:
+        wait.until(EC.staleness_of(previous_table[0]))
+    wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "#groupingTable tbody tr")))
 
-        # Select "Month Wise" for the X-Axis.
-        wait.until(EC.element_to_be_clickable((By.XPATH,"//label[@id='xaxisVar_label']"))).click()
-        wait.until(EC.element_to_be_clickable((By.XPATH, f"//li[@data-label='Month Wise']"))).click()
-        time.sleep(2)
-        
-        # Click the Refresh button.
-        wait.until(EC.element_to_be_clickable((By.XPATH, "//span[text()='Refresh']"))).click()
-        time.sleep(5)
+    # Pull the report's body rows as cell texts straight from the browser.
+    rows = driver.execute_script(
+        "return Array.from(document.querySelectorAll('#groupingTable_data > tr'), function (row) {"
+        "  return Array.from(row.cells, function (cell) { return cell.textContent.trim(); });"
+        "});"
+    )
 
-        # Scrape the page content.
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
-    
-    finally:
-        driver.quit()
-    
-    # Create the 'src' directory if it does not exist.
-    os.makedirs("src", exist_ok=True)
+    # The table's markup is only serialized when the HTML archive is enabled.
+    html_text = None
+    if SAVE_HTML:
+        html_text = driver.execute_script(
+            "var table = document.getElementById('groupingTable');"
+            "return (table || document.documentElement).outerHTML;"
+        )
+
+    json_path = save_table(rows, html_text, filename)
+
+    print(f"Saved rows for vehicle category {year} to {json_path}")
+
+def run(driver):
+    """
+    Scrapes the month-wise vehicle category tables for every year using an open driver.
+    """
+    years = ["2025", "2024","2023"]
     
-    file_path = os.path.join("src", filename)
+    # Start from the default filters, since the driver may have been used by another scraper.
+    load_dashboard(driver)
     
-    with open(file_path, "w", encoding="utf-8") as f:
-        f.write(soup.prettify())
-        
-    print(f"Saved HTML for vehicle category {year} to {filename}")
-        
-if __name__ == "__main__":
-    years = ["2025", "2024","2023"]
+    # Reuse a single browser session for every year instead of relaunching Chrome.
     for year in years:
         fname = f"vehicle_category_month_wise_{year}.html"
-        fetch_vehicle_categoty_monthwise_data(year, fname)
\ No newline at end of file
+        fetch_vehicle_categoty_monthwise_data(driver, year, fname)
+
+if __name__ == "__main__":
+    driver = open_vahan("vehicle_category_monthwise")
+    try:
+        run(driver)
+    finally:
+        driver.quit()
@@ -1,72 +1,197 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup
-import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+import itertools
+import lxml.etree
+import lxml.html
+import requests
+from requests.adapters import HTTPAdapter
 import os
+import re
+from vahan_output import save_table
+
+VAHAN_URL = "https://vahan.parivahan.gov.in/vahan4dashboard/vahan/view/reportview.xhtml"
+FORM_ID = "masterLayout_formlogin"
+
+# One connection pool shared by every fetch's session, so the TLS connections to the Vahan host
+# are kept alive and reused across fetches. Cookies stay per session, so each fetch keeps its own JSF view.
+HTTP_ADAPTER = HTTPAdapter(pool_connections=1, pool_maxsize=16)
+
+def ajax_config(element):
+    """
+    Reads the PrimeFaces AJAX settings a component sends from its own event handler.
+
+    Args:
+        element (HtmlElement): The component's <select> or <button> element from the page.
+
+    Returns:
+        dict: The source ("s"), event ("e"), processed ids ("p") and updated ids ("u") found in the handler.
+    """
+    handler = element.get("onchange") or element.get("onclick") or ""
+    config = dict(re.findall(r'\b([sepu]):"([^"]*)"', handler))
+    if "s" not in config:
+        raise RuntimeError(f"No PrimeFaces AJAX handler found on {element.get('id')}")
+    return config
+
+def post_partial(session, action, form_values, config, values=None):
+    """
+    Replays a PrimeFaces AJAX request against the Vahan JSF form.
+
+    Args:
+        session (requests.Session): The session holding the JSF view's cookies.
+        action (str): The form's action URL.
+        form_values (dict): The current form field values; the ViewState is updated in place.
+        config (dict): The component's AJAX settings, as read by ajax_config.
+        values (dict): Form field values to change for this request.
+
+    Returns:
+        dict: The updated markup returned by the server, keyed by component id.
+    """
+    source = config["s"]
+    event = config.get("e")
+
+    form_values.update(values or {})
+    data = dict(form_values)
+    data.update({
+        "javax.faces.partial.ajax": "true",
+        "javax.faces.source": source,
+        # PrimeFaces processes the whole view when the handler names nothing to process.
+        "javax.faces.partial.execute": config.get("p", "@all"),
+        "javax.faces.partial.render": config.get("u", ""),
+    })
+    if event:
+        data["javax.faces.behavior.event"] = event
+        data["javax.faces.partial.event"] = event
+    else:
+        data[source] = source
+
+    response = session.post(
+        action,
+        data=data,
+        headers={"Faces-Request": "partial/ajax", "X-Requested-With": "XMLHttpRequest"},
+        timeout=60,
+    )
+    response.raise_for_status()
+
+    # Parse the XML partial-response and collect the markup of each updated component.
+    partial_response = lxml.etree.fromstring(response.content)
+    error = partial_response.find(".//error")
+    if error is not None:
+        raise RuntimeError(f"Vahan returned an error for {source}: {error.findtext('error-message')}")
+
+    updates = {update.get("id"): update.text or "" for update in partial_response.iter("update")}
+    for update_id, markup in updates.items():
+        # Keep the latest ViewState so the next request is accepted by the server.
+        if "javax.faces.ViewState" in update_id:
+            form_values["javax.faces.ViewState"] = markup.strip()
+
+    return updates
+
+def selected_option(markup, select_id):
+    """
+    Returns the text of the selected option of a <select> in some returned markup, or None.
+    """
+    options = lxml.html.fromstring(markup).xpath(f"//select[@id='{select_id}']/option[@selected]")
+    return options[0].text_content().strip() if options else None
 
 def fetch_vahan_data(vehicle_type, year, filename):
     """
     Scrapes vehicle registration data for a specific vehicle type and year.
     """
-    chrome_options = Options()
-    # Use headless mode to run without a visible browser window.
-    # chrome_options.add_argument("--headless")
-    
-    # Path to your chromedriver executable.
-    service = Service("C://Users//jaswa//Downloads//chromedriver-win64//chromedriver-win64//chromedriver.exe")
-
-    driver = webdriver.Chrome(service=service, options=chrome_options)
-    
-    driver.get("https://vahan.parivahan.gov.in/vahan4dashboard/vahan/view/reportview.xhtml")
-    
-    driver.maximize_window()
-    
-    wait = WebDriverWait(driver, 20)
-    
-    # Wait for initial page content to load.
-    time.sleep(5)
-    
+    session = requests.Session()
+    session.mount("https://", HTTP_ADAPTER)
+
+    # Load the dashboard once to start a JSF view and read the initial form state.
+    response = session.get(VAHAN_URL, timeout=60)
+    response.raise_for_status()
+    page = lxml.html.fromstring(response.text)
+    form = page.get_element_by_id(FORM_ID)
+    action = urljoin(VAHAN_URL, form.get("action"))
+    form_values = dict(form.form_values())
+    form_values[FORM_ID] = FORM_ID
+
+    # Select the desired Year from the dropdown menu, sending the same request as its change handler.
+    updates = post_partial(
+        session, action, form_values, ajax_config(page.get_element_by_id("selectedYear_input")),
+        values={"selectedYear_input": year},
+    )
+    selected_year = selected_option(updates.get("selectedYear", "<div/>"), "selectedYear_input")
+    if selected_year != year:
+        raise RuntimeError(f"Vahan selected year {selected_year} instead of {year}")
+
+    # Select the vehicle type in the Vehicle Category Group, which re-renders the report table.
+    group_select = page.get_element_by_id("vchgroupTable:selectCatgGrp_input")
+    group_value = group_select.xpath(f"./option[normalize-space()='{vehicle_type}']/@value")[0]
+    updates = post_partial(
+        session, action, form_values, ajax_config(group_select),
+        values={"vchgroupTable:selectCatgGrp_input": group_value},
+    )
+    table_html = updates.get("vchgroupTable")
+
+    # Click the Refresh button in the filter panel.
+    if vehicle_type == "FOUR WHEELER":
+        refresh_button = page.xpath("//div[contains(@class, 'button-section')]//button")[0]
+        updates = post_partial(session, action, form_values, ajax_config(refresh_button))
+        table_html = updates.get("combTablePnl", table_html)
+
+    if table_html is None:
+        raise RuntimeError(f"No report table returned for {vehicle_type} {year}")
+
+    # Make sure the returned table is for the requested group before saving it, rather than
+    # silently saving a stale or default table. The table's title only shows the selected year
+    # once Refresh re-renders it, so the year is checked there only.
+    selected_group = selected_option(table_html, "vchgroupTable:selectCatgGrp_input")
+    if selected_group != vehicle_type:
+        raise RuntimeError(f"Vahan returned the {selected_group} table instead of {vehicle_type}")
+    if vehicle_type == "FOUR WHEELER" and f"({year})" not in lxml.html.fromstring(table_html).text_content():
+        raise RuntimeError(f"Vahan returned a table that is not for {year}")
+
+    # Pull the report's body rows as cell texts.
+    rows = [
+        [cell.text_content().strip() for cell in row.xpath("./td|./th")]
+        for row in lxml.html.fromstring(table_html).xpath("//tbody[@id='vchgroupTable_data']/tr")
+    ]
+
+    json_path = save_table(rows, table_html, filename)
+
+    print(f"Saved rows for {vehicle_type} {year} to {json_path}")
+
+def run_task(task):
+    """
+    Runs one fetch, reporting a failure instead of raising so the remaining fetches still complete.
+
+    Returns:
+        tuple: The (vehicle_type, year) pair if the fetch failed, otherwise None.
+    """
+    vehicle_type, year, filename = task
     try:
-        # Select the desired Year from the dropdown menu.
-        wait.until(EC.element_to_be_clickable((By.XPATH, "//label[@id='selectedYear_label']"))).click()
-        wait.until(EC.element_to_be_clickable((By.XPATH, f"//li[@data-label='{year}']"))).click()
-        time.sleep(2)
-
-        # Select the vehicle type in the Vehicle Category Group.
-        wait.until(EC.element_to_be_clickable((By.ID, "vchgroupTable:selectCatgGrp_label"))).click()
-        wait.until(EC.element_to_be_clickable((By.XPATH, f"//li[@data-label='{vehicle_type}']"))).click()
-        time.sleep(2)
-
-        # Click the Refresh button.
-        if vehicle_type == "FOUR WHEELER":
-            wait.until(EC.element_to_be_clickable((By.XPATH, "//span[text()='Refresh']"))).click()
-            time.sleep(5)
-
-        # Scrape the page content.
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
-    
-    finally:
-        driver.quit()
-    
-    # Create the 'src' directory if it does not exist.
-    os.makedirs("src", exist_ok=True)
-    
-    file_path = os.path.join("src", filename)
-    
-    with open(file_path, "w", encoding="utf-8") as f:
-        f.write(soup.prettify())
-        
-    print(f"Saved HTML for {vehicle_type} {year} to {filename}")
+        fetch_vahan_data(vehicle_type, year, filename)
+    except Exception as e:
+        print(f"Failed to fetch {vehicle_type} {year}: {e}")
+        return vehicle_type, year
+    return None
 
-if __name__ == "__main__":
+def run():
+    """
+    Fetches the vehicle class tables for every year and vehicle type.
+
+    Raises:
+        RuntimeError: If any fetch failed, once all of them have run.
+    """
     years = ["2025", "2024","2023"]
     vehicle_types = ["TWO WHEELER", "THREE WHEELER", "FOUR WHEELER"]
-    
-    for year in years:
-        for vt in vehicle_types:
-            fname = f"{vt.lower().replace(' ', '_')}_vehicle_class_{year}.html"
-            fetch_vahan_data(vt, year, fname)
\ No newline at end of file
+
+    task_list = [
+        (vt, year, f"{vt.lower().replace(' ', '_')}_vehicle_class_{year}.html")
+        for year, vt in itertools.product(years, vehicle_types)
+    ]
+
+    # Each fetch is independent and network-bound, so they run concurrently.
+    # Every fetch opens its own session, giving it a separate JSF view on the server.
+    with ThreadPoolExecutor(max_workers=min(len(task_list), (os.cpu_count() or 1) * 2)) as executor:
+        failed = [pair for pair in executor.map(run_task, task_list) if pair is not None]
+
+    if failed:
+        raise RuntimeError("Failed to fetch " + ", ".join(f"{vt} {year}" for vt, year in failed))
+
+if __name__ == "__main__":
+    run()
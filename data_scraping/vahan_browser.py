@@ -0,0 +1,69 @@
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.by import By
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+import os
+
+VAHAN_URL = "https://vahan.parivahan.gov.in/vahan4dashboard/vahan/view/reportview.xhtml"
+
+def open_vahan(profile_name):
+    """
+    Launches Chrome and opens the Vahan dashboard report page.
+
+    Args:
+        profile_name (str): The Chrome profile to use under .chrome-cache/. The profile is kept between
+            runs so the dashboard's scripts, styles and fonts are served from the disk cache. Chrome locks
+            a profile while it is open, so browsers running at the same time need different profiles.
+
+    Returns:
+        WebDriver: A driver on the report page, reused for every fetch.
+    """
+    profile_dir = os.path.abspath(os.path.join(".chrome-cache", profile_name))
+    os.makedirs(profile_dir, exist_ok=True)
+
+    chrome_options = Options()
+    # Use headless mode to run without a visible browser window, with a fixed window size
+    # in place of maximizing, and skip GPU work, extensions and image downloads.
+    chrome_options.add_argument("--headless=new")
+    chrome_options.add_argument("--window-size=1920,1080")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-extensions")
+    chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+    chrome_options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    # Return from driver.get once the DOM is ready; the filter panel is waited for explicitly.
+    chrome_options.page_load_strategy = "eager"
+    # Reuse a persistent profile with a 100 MiB disk cache for the site's static assets.
+    chrome_options.add_argument(f"--user-data-dir={profile_dir}")
+    chrome_options.add_argument("--disk-cache-size=104857600")
+
+    # Keep Chrome's own logging to fatal errors only.
+    chrome_options.add_argument("--log-level=3")
+    chrome_options.add_argument("--disable-logging")
+
+    # Selenium Manager finds (or downloads) the chromedriver matching the installed Chrome.
+    # The driver's own logging is switched off and its output discarded.
+    service = Service(log_output=os.devnull, service_args=["--log-level=OFF"])
+
+    driver = webdriver.Chrome(service=service, options=chrome_options)
+    driver.execute_cdp_cmd("Network.setCacheDisabled", {"cacheDisabled": False})
+
+    load_dashboard(driver)
+
+    return driver
+
+def load_dashboard(driver):
+    """
+    Loads the Vahan report page in an open driver with a new server-side session.
+
+    The selected filters are kept in the server's JSF session, so the session cookies are
+    cleared first; otherwise the page would reopen with the previous scraper's filters.
+    """
+    driver.delete_all_cookies()
+    driver.get(VAHAN_URL)
+
+    # Wait until the filter panel has rendered instead of sleeping for a fixed time.
+    WebDriverWait(driver, 20).until(EC.element_to_be_clickable((By.ID, "selectedYear_label")))
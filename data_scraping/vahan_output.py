@@ -0,0 +1,43 @@
+import gzip
+import json
+import os
+
+# Set VAHAN_SAVE_HTML=1 to also archive the markup of every scraped table, e.g. for debugging.
+SAVE_HTML = os.environ.get("VAHAN_SAVE_HTML") == "1"
+
+# Create the 'src' directory once, when the module is loaded.
+os.makedirs("src", exist_ok=True)
+
+def save_table(rows, html_text, filename):
+    """
+    Saves a scraped report table to the src directory.
+
+    Args:
+        rows (list): The table's body rows, each a list of cell texts. Must not be empty.
+        html_text (str): The table's markup, archived as a gzip-compressed HTML file only if
+            VAHAN_SAVE_HTML is set.
+        filename (str): The name of the HTML file; the rows are saved to the matching .json file.
+
+    Returns:
+        str: The path of the saved JSON file.
+    """
+    # An empty table means the rows were not found; keep the previously saved data instead.
+    if not rows:
+        raise RuntimeError(f"No table rows were scraped for {filename}")
+
+    # Collapse runs of whitespace inside each cell, as pandas.read_html does, so that keys such as
+    # maker names match between tables saved as JSON and tables still read from HTML.
+    rows = [[" ".join(cell.split()) for cell in row] for row in rows]
+
+    # The dashboard builds its tables straight from these rows, without parsing any HTML.
+    json_path = os.path.join("src", f"{os.path.splitext(filename)[0]}.json")
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(rows, f)
+
+    if SAVE_HTML and html_text is not None:
+        # Store the page gzip-compressed at the fastest level, through a 1 MiB write buffer.
+        file_path = os.path.join("src", f"{filename}.gz")
+        with open(file_path, "wb", buffering=1 << 20) as raw, gzip.open(raw, "wt", encoding="utf-8", compresslevel=1) as f:
+            f.write(html_text)
+
+    return json_path
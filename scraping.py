@@ -1,19 +1,44 @@
-import subprocess
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
-scripts = [
-    "data_scraping/data_manufacturer_monthwise.py",
-    "data_scraping/data_manufacturer.py",
-    "data_scraping/data_vehicle_category_monthwise.py",
-    "data_scraping/data_vehicle_class.py"
+# The scrapers live in data_scraping/ and import their shared browser helper from there.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "data_scraping"))
+
+import data_manufacturer
+import data_manufacturer_monthwise
+import data_vehicle_category_monthwise
+import data_vehicle_class
+from vahan_browser import open_vahan
+
+selenium_scrapers = [
+    data_manufacturer_monthwise,
+    data_manufacturer,
+    data_vehicle_category_monthwise,
 ]
 
-for script in scripts:
-    print(f"\n Running: {script}")
-    result = subprocess.run([sys.executable, script], capture_output=True, text=True)
-    
-    print(result.stdout)
-    if result.stderr:
-        print(f" Errors/Warnings from {script}:\n{result.stderr}")
+# The vehicle class fetch needs no browser, so it runs in the background while the
+# Selenium scrapers take turns on a single shared Chrome session.
+with ThreadPoolExecutor(max_workers=1) as executor:
+    print("\n Running: data_vehicle_class")
+    vehicle_class = executor.submit(data_vehicle_class.run)
+
+    driver = open_vahan("scraping")
+    try:
+        for scraper in selenium_scrapers:
+            print(f"\n Running: {scraper.__name__}")
+            try:
+                scraper.run(driver)
+                print(f"\n Finished: {scraper.__name__}")
+            except Exception as e:
+                print(f"\n {scraper.__name__} failed: {e}")
+    finally:
+        driver.quit()
+
+    try:
+        vehicle_class.result()
+        print("\n Finished: data_vehicle_class")
+    except Exception as e:
+        print(f"\n data_vehicle_class failed: {e}")
 
 print("\n All scripts finished running.")